@@ -3,19 +3,32 @@ HTTP server for Spotify audio streams. WAV (PCM) path only.
 We serve standard HTTP range semantics so Kodi's cache/buffer settings take effect.
 """
 
+import queue
+import re
 import threading
 import time
 import uuid
-from typing import Callable, Optional
+from typing import Callable, Optional, Tuple
 
 import bottle
-import spotipy
-import xbmc
-import xbmcaddon
 import xbmcgui
 from spotty import Spotty
-from spotty_audio_streamer import SpottyAudioStreamer
-from utils import ADDON_ID, ADDON_WINDOW_ID, LOGDEBUG, get_cached_auth_token, log_msg
+from spotty_audio_streamer import (
+    SpottyAudioStreamer,
+    create_wav_header_for_duration,
+    sanitize_bitrate,
+    sanitize_normalization,
+)
+from utils import (
+    ADDON_WINDOW_ID,
+    LOGDEBUG,
+    cache_liked_states,
+    get_addon,
+    get_cached_auth_token,
+    get_spotify_client,
+    log_exception,
+    log_msg,
+)
 
 
 _settings_cache = {
@@ -26,9 +39,13 @@ _settings_cache = {
 _settings_cache_lock = threading.Lock()
 _SETTINGS_CACHE_TTL = 1.0  # Cache for 1 second
 
+# Single byte range as sent by Kodi's CurlFile: "bytes=START-", "bytes=START-END"
+# or the suffix form "bytes=-LENGTH".
+_RANGE_RE = re.compile(r"\s*bytes=\s*(\d*)\s*-\s*(\d*)")
+
 
 def _get_current_stream_settings():
-    """Read addon settings with caching to avoid expensive xbmcaddon.Addon() creation.
+    """Read the stream settings, cached briefly so each range request skips the settings lookup.
 
     Returns (bitrate, normalization)
     """
@@ -40,12 +57,9 @@ def _get_current_stream_settings():
             return _settings_cache["bitrate"], _settings_cache["normalization"]
 
         try:
-            addon = xbmcaddon.Addon(id=ADDON_ID)
-            bitrate_raw = (addon.getSetting("spotify_bitrate") or "320").strip()
-            bitrate = bitrate_raw if bitrate_raw in ("96", "160", "320") else "320"
-            norm = (addon.getSetting("spotify_normalization") or "auto").strip().lower()
-            if norm not in ("off", "auto", "track", "album"):
-                norm = "auto"
+            addon = get_addon()
+            bitrate = sanitize_bitrate(addon.getSetting("spotify_bitrate"))
+            norm = sanitize_normalization(addon.getSetting("spotify_normalization"))
 
             _settings_cache["bitrate"] = bitrate
             _settings_cache["normalization"] = norm
@@ -55,6 +69,31 @@ def _get_current_stream_settings():
             return _settings_cache["bitrate"], _settings_cache["normalization"]
 
 
+def _parse_duration(duration: str) -> float:
+    """Parse the duration segment of a track URL into seconds (at least 1.0)."""
+    try:
+        return max(1.0, float(duration))
+    except (ValueError, TypeError):
+        return 1.0
+
+
+# Track-started callbacks are handed to one long-lived worker instead of a new
+# thread per request, so the route handler never waits on OSD/playlist work.
+_notify_queue = queue.SimpleQueue()
+
+
+def _notify_worker() -> None:
+    while True:
+        func, args = _notify_queue.get()
+        try:
+            func(*args)
+        except Exception as exc:
+            log_exception(exc, "Track-started callback failed")
+
+
+threading.Thread(target=_notify_worker, name="SpottyNotify", daemon=True).start()
+
+
 # No debounce: serve every range request immediately so Kodi's seek bar and
 # Player.Progress update right away. Let Kodi drive; we just fulfill each request.
 
@@ -80,15 +119,17 @@ class HTTPSpottyAudioStreamer:
         ).strip().lower() or "auto"
         self.__spotty_streamer.use_autoplay = use_autoplay
         self.__spotty_streamer.bitrate = bitrate
-        self.__is_streaming = False
+        # (is_streaming, current_track_id). Always replaced as a whole tuple so
+        # readers outside __stream_lock still see a consistent pair.
+        self.__stream_state: Tuple[bool, Optional[str]] = (False, None)
         self.__stream_lock = threading.Lock()
-        self.__current_track_id: Optional[str] = None
         self.__current_request_id: str = ""  # Track current request to ignore stale generators
         # Init coordination: when a new-track GET is being initialized, set this
         # so other concurrent GETs can wait and then reuse the same request id.
+        # The condition shares __stream_lock, so waiters release the lock while
+        # blocked and the initializer is never held up by them.
         self.__init_in_progress = False
-        self.__init_event = threading.Event()
-        self.__init_event.set()
+        self.__init_done = threading.Condition(self.__stream_lock)
 
     def set_normalization_gain_type(self, value: str) -> None:
         self.__spotty_streamer.normalization_gain_type = (
@@ -104,27 +145,27 @@ class HTTPSpottyAudioStreamer:
 
         Pass the track_id that just finished so we can ignore stale calls when a new
         track has already started (e.g. the old generator finishes *after* QueueNextFileEx
-        has already transitioned __current_track_id to the next track).
+        has already transitioned the current track id to the next track).
         """
         with self.__stream_lock:
-            if track_id is not None and self.__current_track_id != track_id:
-                # A newer track is already loaded — don't clobber its __is_streaming flag.
+            current_track_id = self.__stream_state[1]
+            if track_id is not None and current_track_id != track_id:
+                # A newer track is already loaded — don't clobber its streaming flag.
                 log_msg(
                     f"set_stream_ended: ignoring stale end for {track_id} "
-                    f"(current={self.__current_track_id})",
+                    f"(current={current_track_id})",
                     LOGDEBUG,
                 )
                 return
-            self.__is_streaming = False
-            # Do NOT clear __current_track_id here. It must remain set so that
+            self.__stream_state = (False, current_track_id)
+            # Do NOT clear the current track id here. It must remain set so that
             # _previous_track_id is non-null when QueueNextFileEx fires after the
             # stream ends naturally (minutes before audio fully plays out of Kodi's
             # buffer), allowing _skip_terminate to correctly skip the terminate call.
 
     def is_current_track_streaming(self, track_id: str) -> bool:
         """Check if the given track is still being streamed to Kodi."""
-        with self.__stream_lock:
-            return self.__is_streaming and self.__current_track_id == track_id
+        return self.__stream_state == (True, track_id)
 
     def set_on_track_started(self, func: Callable[[str, float], None]) -> None:
         self.__on_track_started = func or (lambda _id, _dur: None)
@@ -134,7 +175,7 @@ class HTTPSpottyAudioStreamer:
 
     def stop(self) -> None:
         log_msg("Stopping spotty audio streaming.", LOGDEBUG)
-        if self.__is_streaming:
+        if self.__stream_state[0]:
             self.__terminate_streaming()
         else:
             log_msg("No running audio streamer. Nothing to stop.", LOGDEBUG)
@@ -154,13 +195,16 @@ class HTTPSpottyAudioStreamer:
         # directly instead of trying VideoPlayer first (demuxer error + retry).
         if duration.endswith(".wav"):
             duration = duration[:-4]
-        log_msg(f"{bottle.request.method} request: {bottle.request}", LOGDEBUG)
+        # Parsed once here; every consumer below takes the float.
+        duration_sec = _parse_duration(duration)
+        request = bottle.request
+        log_msg(f"{request.method} request: {request}", LOGDEBUG)
 
         # HEAD requests: return headers only. NEVER mutate state, call set_track(),
         # overwrite __current_request_id, or fire on_track_started. HEAD probes must
         # be invisible to the streaming pipeline.
-        if bottle.request.method.upper() != "GET":
-            return self._handle_head_only(track_id, duration)
+        if request.method.upper() != "GET":
+            return self._handle_head_only(track_id, duration_sec)
 
         # Generate unique request ID to prevent stale generators from executing
         request_id = str(uuid.uuid4())
@@ -168,17 +212,16 @@ class HTTPSpottyAudioStreamer:
         # Read settings FIRST.
         bitrate, norm = _get_current_stream_settings()
 
-        request_range = bottle.request.headers.get("Range", "")
-        is_new_track = not self.__is_streaming or self.__current_track_id != track_id
-        # Capture BEFORE the is_new_track lock block sets self.__current_track_id = track_id
-        # (line ~191). Used by _skip_terminate to identify QueueNextFileEx pre-loads.
-        _previous_track_id = self.__current_track_id
+        # Read the raw WSGI value once; the handlers below only see this string.
+        request_range = request.environ.get("HTTP_RANGE", "").strip()
+        # Capture BEFORE the is_new_track lock block below replaces the stream state.
+        # _previous_track_id is used by _skip_terminate to identify QueueNextFileEx pre-loads.
+        is_streaming, _previous_track_id = self.__stream_state
+        is_new_track = not is_streaming or _previous_track_id != track_id
 
-        _r = (request_range or "").strip()
         from_start = (
-            not _r
-            or _r == "bytes=0-"
-            or (_r.startswith("bytes=0-") and len(_r) > 8)  # bytes=0-1048575 etc.
+            not request_range
+            or request_range.startswith("bytes=0-")  # bytes=0- or bytes=0-1048575 etc.
         )
 
         if from_start:
@@ -190,24 +233,22 @@ class HTTPSpottyAudioStreamer:
         if is_new_track:
             with self.__stream_lock:
                 # If another init is already in progress for same track, wait briefly.
-                if self.__init_in_progress and self.__current_track_id == track_id:
+                if self.__init_in_progress and self.__stream_state[1] == track_id:
                     log_msg(f"Init already in progress for {track_id}, waiting.", LOGDEBUG)
                     # Wait up to 1s for init to complete
-                    self.__init_event.wait(1.0)
+                    self.__init_done.wait_for(lambda: not self.__init_in_progress, 1.0)
                     # After wait, if streamer was initialized, treat as non-new
-                    if self.__is_streaming and self.__current_track_id == track_id:
+                    if self.__stream_state == (True, track_id):
                         is_new_track = False
                         request_id = self.__current_request_id
-                elif self.__is_streaming and self.__current_track_id == track_id:
+                elif self.__stream_state == (True, track_id):
                     # Already streaming same track — reuse request id.
                     is_new_track = False
                     request_id = self.__current_request_id
                 else:
                     # We are the initializer for this new track. Reserve slot.
                     self.__init_in_progress = True
-                    self.__init_event.clear()
-                    self.__is_streaming = True
-                    self.__current_track_id = track_id
+                    self.__stream_state = (True, track_id)
                     self.__current_request_id = request_id
                     # release lock and continue initialization below
                     # (will clear init_in_progress after set_track)
@@ -215,7 +256,7 @@ class HTTPSpottyAudioStreamer:
         else:
             # Not a new track — reuse request id if already streaming this track.
             with self.__stream_lock:
-                if self.__is_streaming and self.__current_track_id == track_id:
+                if self.__stream_state == (True, track_id):
                     request_id = self.__current_request_id
 
         # Fetch prebuffer result (WAV bytes if prebuffer was used).
@@ -229,6 +270,8 @@ class HTTPSpottyAudioStreamer:
                 kind = f"{len(prebuf_result.data)} bytes"
                 log_msg(f"Prebuffer hit for track {track_id} ({kind}).", LOGDEBUG)
 
+        # Length of the track this request set up; 0 means "use the streamer's current".
+        track_length = 0
         if is_new_track:
             # Cancel any running prebuffer immediately so its spotty process doesn't
             # compete with the main stream for the single Spotify connection.  A
@@ -265,29 +308,21 @@ class HTTPSpottyAudioStreamer:
             with self.__stream_lock:
                 self.__spotty_streamer.bitrate = bitrate
                 self.__spotty_streamer.normalization_gain_type = norm
-                self.__spotty_streamer.set_track(track_id, float(duration))
-                self.__is_streaming = True
-                self.__current_track_id = track_id
+                self.__spotty_streamer.set_track(track_id, duration_sec)
+                track_length = self.__spotty_streamer.get_track_length()
+                self.__stream_state = (True, track_id)
                 self.__current_request_id = request_id
-            # Initialization complete — clear init flag and notify waiters.
-            with self.__stream_lock:
+                # Initialization complete — clear init flag and notify waiters.
                 if self.__init_in_progress:
                     self.__init_in_progress = False
-                    try:
-                        self.__init_event.set()
-                    except Exception:
-                        pass
+                    self.__init_done.notify_all()
             log_msg(
                 f"Start streaming spotify track '{track_id}',"
-                f" track length {self.__spotty_streamer.get_track_length()}."
+                f" track length {track_length}."
             )
 
             # Fire and forget notification
-            threading.Thread(
-                target=self.__on_track_started,
-                args=(track_id, float(duration)),
-                daemon=True,
-            ).start()
+            _notify_queue.put((self.__on_track_started, (track_id, duration_sec)))
 
         log_msg(f"Request header range: '{request_range}'.", LOGDEBUG)
 
@@ -297,32 +332,29 @@ class HTTPSpottyAudioStreamer:
             prebuf_result,
             has_prebuf,
             track_id=track_id,
-            duration_str=duration,
+            duration_sec=duration_sec,
             request_id=request_id,
+            track_length=track_length,
         )
 
     spotty_stream_audio_track.route = SPOTTY_AUDIO_TRACK_ROUTE
 
-    def _handle_head_only(self, track_id: str, duration: str):
+    def _handle_head_only(self, track_id: str, duration_sec: float):
         """Return headers for HEAD requests without touching any streaming state."""
-        try:
-            dur = max(1.0, float(duration))
-        except (ValueError, TypeError):
-            dur = 1.0
-
+        response = bottle.response
         # Always derive size from the URL's duration — the current streamer may have a
         # different track loaded, which would return the wrong Content-Length for queued
         # (non-current) tracks and confuse Kodi's prefetch queue.
         pcm_bps = 44100 * 2 * 2  # 176400 bytes/sec at 44.1 kHz 16-bit stereo
-        file_size = int(dur * pcm_bps) + 44  # +44 for WAV header
+        file_size = int(duration_sec * pcm_bps) + 44  # +44 for WAV header
 
-        bottle.response.status = 200
-        bottle.response.content_type = "audio/x-wav"
-        bottle.response.content_length = file_size
-        bottle.response.headers["Accept-Ranges"] = "bytes"
+        response.status = 200
+        response.content_type = "audio/x-wav"
+        response.content_length = file_size
+        response.headers["Accept-Ranges"] = "bytes"
 
         log_msg(
-            f"HEAD response: track={track_id}, content_length={bottle.response.content_length}",
+            f"HEAD response: track={track_id}, content_length={response.content_length}",
             LOGDEBUG,
         )
         return ""
@@ -338,51 +370,28 @@ class HTTPSpottyAudioStreamer:
         prebuf_result,
         has_prebuf,
         track_id=None,
-        duration_str=None,
+        duration_sec=1.0,
         request_id=None,
+        track_length=0,
     ):
         streamer = self.__spotty_streamer
-        # Parse duration from request URL
-        _duration_sec = 1.0
-        if track_id and duration_str:
-            try:
-                _duration_sec = max(1.0, float(duration_str))
-            except (ValueError, TypeError):
-                pass
-
-        file_size = streamer.get_track_length()
+        response = bottle.response
+        file_size = track_length or streamer.get_track_length()
         range_begin = 0
         range_end = file_size
         is_seek = False
 
-        # Only call set_track if this is a new track or file_size is invalid.
-        # For new tracks, set_track() was already called in spotty_stream_audio_track() inside the lock.
-        # This is just a safety net for recovery if file_size is invalid.
-        if (file_size <= 0 or file_size < 50000) and track_id:
-            # Compute WAV header length without mutating shared streamer state to
-            # ensure HEAD/early requests can return accurate Content-Length.
-            try:
-                from spotty_audio_streamer import create_wav_header_for_duration
-
-                _, total_length = create_wav_header_for_duration(_duration_sec)
-                file_size = total_length
-                range_end = file_size
-                log_msg(
-                    f"Computed WAV header length from duration={_duration_sec}s -> file_size={file_size}.",
-                    LOGDEBUG,
-                )
-            except Exception:
-                # Fallback to previous behavior (mutating streamer) if static header generation fails.
-                try:
-                    streamer.set_track(track_id, _duration_sec)
-                    file_size = streamer.get_track_length()
-                    range_end = file_size
-                    log_msg(
-                        f"Recovered track length from URL (duration={_duration_sec}s), file_size={file_size}.",
-                        LOGDEBUG,
-                    )
-                except Exception:
-                    pass
+        # For new tracks, set_track() was already called in spotty_stream_audio_track()
+        # inside the lock. If the loaded track length looks invalid, derive it from the
+        # URL duration instead, without mutating shared streamer state, so early requests
+        # still get an accurate Content-Length.
+        if file_size < 50000 and track_id:
+            _, file_size = create_wav_header_for_duration(duration_sec)
+            range_end = file_size
+            log_msg(
+                f"Computed WAV header length from duration={duration_sec}s -> file_size={file_size}.",
+                LOGDEBUG,
+            )
 
         prebuf_data = prebuf_result.data if (has_prebuf and prebuf_result) else None
 
@@ -394,27 +403,16 @@ class HTTPSpottyAudioStreamer:
             )
         else:
             status = "206 Partial Content"
-            try:
-                parts = (
-                    bottle.request.headers["Range"]
-                    .strip()
-                    .split("bytes=", 1)[1]
-                    .split("-", 1)
-                )
-                start_s = parts[0].strip() if parts else ""
-                end_s = parts[1].strip() if len(parts) > 1 else ""
-                if not start_s and end_s.isdigit():
-                    suffix = int(end_s)
-                    range_begin = max(0, file_size - suffix)
-                    range_end = file_size
-                else:
-                    range_begin = int(start_s) if start_s else 0
-                    range_end = int(end_s) if end_s.isdigit() else file_size
-                range_begin = max(0, min(range_begin, file_size))
-                range_end = max(range_begin, min(range_end, file_size))
-            except (ValueError, IndexError, KeyError):
-                range_begin = 0
+            m = _RANGE_RE.match(request_range)
+            start_s, end_s = m.groups() if m else ("", "")
+            if not start_s and end_s:
+                range_begin = max(0, file_size - int(end_s))
                 range_end = file_size
+            else:
+                range_begin = int(start_s) if start_s else 0
+                range_end = int(end_s) if end_s else file_size
+            range_begin = max(0, min(range_begin, file_size))
+            range_end = max(range_begin, min(range_end, file_size))
             # Content-Range end is inclusive — use range_end - 1
             content_range = f"bytes {range_begin}-{range_end - 1}/{file_size}"
             if not is_new_track and range_begin > 0:
@@ -444,7 +442,7 @@ class HTTPSpottyAudioStreamer:
         # Check if this request is stale BEFORE returning generator (before HTTP headers commit)
         if request_id and request_id != self.__current_request_id:
             log_msg(f"WAV request {request_id} is stale (current: {self.__current_request_id}), returning empty.", LOGDEBUG)
-            bottle.response.status = 204  # No Content
+            response.status = 204  # No Content
             return ""
 
         def generate():
@@ -507,16 +505,14 @@ class HTTPSpottyAudioStreamer:
                 )
                 raise
 
-        bottle.response.status = status
-        bottle.response.headers["Accept-Ranges"] = "bytes"
-        bottle.response.content_type = "audio/x-wav"
-        bottle.response.content_length = range_end - range_begin
+        response.status = status
+        response.headers["Accept-Ranges"] = "bytes"
+        response.content_type = "audio/x-wav"
+        response.content_length = range_end - range_begin
         if content_range:
-            bottle.response.headers["Content-Range"] = content_range
+            response.headers["Content-Range"] = content_range
 
-        if bottle.request.method.upper() == "GET":
-            return generate()
-        return ""
+        return generate()
 
     def toggle_track_like(self, track_id: str) -> bottle.Response:
         """Toggle the liked status of a track in Spotify"""
@@ -528,7 +524,7 @@ class HTTPSpottyAudioStreamer:
                 return "Unauthorized"
 
             # Create Spotify client
-            sp = spotipy.Spotify(auth=token)
+            sp = get_spotify_client(token)
 
             # Check if track is currently liked
             result = sp.current_user_saved_tracks_contains([track_id])
@@ -543,6 +539,7 @@ class HTTPSpottyAudioStreamer:
                 # Like the track
                 sp.current_user_saved_tracks_add([track_id])
                 liked_status = "true"
+            cache_liked_states({track_id: not is_liked})
 
             # Update the window property for the current track
             win = xbmcgui.Window(ADDON_WINDOW_ID)
@@ -552,11 +549,9 @@ class HTTPSpottyAudioStreamer:
             win.setProperty("Spotify.TrackLikeChanged", "true")
 
             # Clear the change flag after a short delay to allow UI to react
-            def clear_flag():
-                xbmc.sleep(100)
-                win.clearProperty("Spotify.TrackLikeChanged")
-
-            threading.Thread(target=clear_flag, daemon=True).start()
+            timer = threading.Timer(0.1, win.clearProperty, ("Spotify.TrackLikeChanged",))
+            timer.daemon = True
+            timer.start()
 
             # Return success response
             bottle.response.content_type = "application/json"
@@ -3,36 +3,43 @@ plugin.audio.spotifykodiconnect
 SpotifyKodiConnect - service: spotty + HTTP audio streaming to Kodi.
 """
 
+import collections
 import math
 import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
 
 import bottle_manager
-import spotipy
 import spotty
 import utils
 import xbmc
-import xbmcaddon
 import xbmcgui
 from http_spotty_audio_streamer import HTTPSpottyAudioStreamer
 from playlist_next import get_next_playlist_item, parse_track_url
 from prebuffer import PrebufferManager
+from spotty_audio_streamer import sanitize_bitrate, sanitize_normalization
 from spotty_auth import SpottyAuth
 from spotty_helper import SpottyHelper
 from string_ids import WELCOME_AUTHENTICATED_STR_ID
 from utils import (
-    ADDON_ID,
     ADDON_WINDOW_ID,
     PROXY_HOST,
     PROXY_PORT,
+    cache_liked_states,
+    clear_liked_states,
+    get_addon,
     get_cached_auth_token,
+    get_cached_liked_state,
+    get_spotify_client,
     log_exception,
     log_msg,
+    spotify_api_errors,
 )
 from xbmc import LOGDEBUG, LOGWARNING
 
-SPOTIFY_ADDON = xbmcaddon.Addon(id=ADDON_ID)
 
 # Artist fanart for Music OSD (single largest image URL; no rotation – Spotify only provides same image in multiple sizes)
 _artist_fanart_urls = []  # type: list
@@ -40,6 +47,46 @@ _artist_fanart_index = 0
 # Track ID for which the liked state was last fetched. Prevents __on_track_started
 # from resetting Spotify.CurrentTrackLiked on every Kodi buffering re-request.
 _liked_state_track_id: str = ""
+# Largest image URL per artist id, with the monotonic time it was fetched. Playing
+# an album looks up the same artist for every track; the image rarely changes.
+_ARTIST_IMAGE_TTL_SECS = 24 * 3600
+_ARTIST_IMAGE_CACHE_SIZE = 256
+_artist_image_cache: "collections.OrderedDict[str, Tuple[float, str]]" = collections.OrderedDict()
+# First artist id per track id; fixed for a track, so only bounded, never expired.
+_track_artist_ids: "collections.OrderedDict[str, str]" = collections.OrderedDict()
+_artist_image_cache_lock = threading.Lock()
+# One saved-tracks lookup covers the current track plus up to 49 queued ones, so playing
+# through a playlist costs one API call per 50 tracks. The states live in utils' liked
+# cache (shared with the HTTP toggle route) and are cleared when playback stops.
+_LIKED_BATCH_SIZE = 50
+# Seconds between auth attempts while Spotify is not yet authorized, and the
+# longest the main loop sleeps while it waits for the token renewal deadline.
+# waitForAbort runs on a monotonic clock that stands still while the device is
+# suspended, so keep each wait short and re-check the wall-clock deadline.
+_AUTH_RETRY_SECS = 6
+_MAX_LOOP_WAIT_SECS = 60
+# Repeated track-start callbacks for the same track within this window are dropped.
+_TRACK_START_DEBOUNCE_SECS = 5.0
+# One-shot background work (Spotify lookups, autoplay, ToggleLike) runs on a small
+# fixed pool instead of a new thread per task, so rapid skipping cannot turn into a
+# thread-creation storm.
+_background = ThreadPoolExecutor(max_workers=4, thread_name_prefix="SpotifyService")
+
+
+def _log_work_failure(future) -> None:
+    exc = future.exception()
+    if exc is not None:
+        log_exception(exc, "Background task failed")
+
+
+def _submit_work(func, *args) -> None:
+    try:
+        future = _background.submit(func, *args)
+    except RuntimeError:
+        # The pool is already shut down; drop work that arrives during teardown.
+        log_msg(f"Service shutting down, dropped background task {func.__name__}.", LOGDEBUG)
+        return
+    future.add_done_callback(_log_work_failure)
 
 
 class _SpotifyOSDServiceMonitor(xbmc.Monitor):
@@ -50,12 +97,21 @@ class _SpotifyOSDServiceMonitor(xbmc.Monitor):
                          Performs the Spotify liked-state toggle entirely inside
                          the service process, avoiding RunPlugin reentry problems
                          with the audio plugin while a track is streaming.
+
+    Also forwards addon settings changes to the service.
     """
 
+    def __init__(self):
+        super().__init__()
+        self.settings_changed_handler: Callable[[], None] = lambda: None
+
+    def onSettingsChanged(self) -> None:
+        self.settings_changed_handler()
+
     def onNotification(self, sender: str, method: str, data: str) -> None:
         if sender == "plugin.audio.spotifykodiconnect" and method == "Other.ToggleLike":
-            log_msg("ToggleLike notification received, spawning handler.", LOGDEBUG)
-            threading.Thread(target=self._handle_toggle_like, daemon=True).start()
+            log_msg("ToggleLike notification received, queueing handler.", LOGDEBUG)
+            _submit_work(self._handle_toggle_like)
 
     @staticmethod
     def _handle_toggle_like() -> None:
@@ -81,7 +137,7 @@ class _SpotifyOSDServiceMonitor(xbmc.Monitor):
             else:
                 win.setProperty("Spotify.CurrentTrackLiked", "true")
 
-            sp = spotipy.Spotify(auth=token)
+            sp = get_spotify_client(token)
             try:
                 if currently_liked:
                     sp.current_user_saved_tracks_delete([track_id])
@@ -101,6 +157,7 @@ class _SpotifyOSDServiceMonitor(xbmc.Monitor):
             # Keep _liked_state_track_id in sync so the next buffering
             # re-request for the same track doesn't overwrite the new state.
             _liked_state_track_id = track_id
+            cache_liked_states({track_id: not currently_liked})
         except Exception as exc:
             log_exception(exc, "ToggleLike notification handler failed")
 
@@ -108,6 +165,110 @@ class _SpotifyOSDServiceMonitor(xbmc.Monitor):
 _monitor = _SpotifyOSDServiceMonitor()
 
 
+@dataclass
+class _ServiceSettings:
+    """Snapshot of the addon settings the service acts on, refreshed on change."""
+
+    normalization: str = "auto"
+    bitrate: str = "320"
+    autoplay: bool = False
+    prebuffer_enabled: bool = True
+
+
+def _read_settings() -> _ServiceSettings:
+    addon = get_addon()
+    return _ServiceSettings(
+        normalization=sanitize_normalization(addon.getSetting("spotify_normalization")),
+        bitrate=sanitize_bitrate(addon.getSetting("spotify_bitrate")),
+        autoplay=addon.getSettingBool("spotify_autoplay"),
+        prebuffer_enabled=addon.getSettingBool("prebuffer_enabled"),
+    )
+
+
+def _get_artist_image_url(sp, artist_id: str) -> str:
+    """Return the artist's largest image URL ("" if none), cached per artist id."""
+    now = time.monotonic()
+    with _artist_image_cache_lock:
+        cached = _artist_image_cache.get(artist_id)
+        if cached and now - cached[0] < _ARTIST_IMAGE_TTL_SECS:
+            _artist_image_cache.move_to_end(artist_id)
+            return cached[1]
+
+    artist = sp.artist(artist_id)
+    images = (artist or {}).get("images") or []
+    # Spotify returns same image in multiple sizes (640, 300, 64); use only largest
+    url = (images[0].get("url") or "") if images else ""
+
+    with _artist_image_cache_lock:
+        _artist_image_cache[artist_id] = (now, url)
+        _artist_image_cache.move_to_end(artist_id)
+        while len(_artist_image_cache) > _ARTIST_IMAGE_CACHE_SIZE:
+            _artist_image_cache.popitem(last=False)
+    return url
+
+
+def _get_track_artist_id(sp, track_id: str) -> str:
+    """Return the id of the track's first artist ("" if none), cached per track id."""
+    with _artist_image_cache_lock:
+        artist_id = _track_artist_ids.get(track_id)
+        if artist_id is not None:
+            _track_artist_ids.move_to_end(track_id)
+            return artist_id
+
+    track = sp.track(track_id)
+    artists = (track or {}).get("artists") or []
+    artist_id = (artists[0].get("id") or "") if artists else ""
+
+    with _artist_image_cache_lock:
+        _track_artist_ids[track_id] = artist_id
+        while len(_track_artist_ids) > _ARTIST_IMAGE_CACHE_SIZE:
+            _track_artist_ids.popitem(last=False)
+    return artist_id
+
+
+def _get_track_artist_image_url(sp, track_id: str) -> str:
+    artist_id = _get_track_artist_id(sp, track_id)
+    return _get_artist_image_url(sp, artist_id) if artist_id else ""
+
+
+def _prefetch_track_artist_image(track_id: str) -> None:
+    """Warm the artist caches for an upcoming track so its OSD fanart is instant."""
+    token = get_cached_auth_token()
+    if not token:
+        return
+    try:
+        _get_track_artist_image_url(get_spotify_client(token), track_id)
+    except spotify_api_errors() as exc:
+        log_msg(f"Could not prefetch artist image for {track_id}: {exc}", LOGDEBUG)
+
+
+def _queued_track_ids(count: int) -> List[str]:
+    """Spotify track ids of up to count items of Kodi's music playlist from the current position.
+
+    The current position is included: Kodi often has not advanced it yet when a stream starts.
+    """
+    playlist = xbmc.PlayList(xbmc.PLAYLIST_MUSIC)
+    start = max(playlist.getposition(), 0)
+    track_ids = []
+    for index in range(start, min(playlist.size(), start + count)):
+        track_id, _ = parse_track_url(playlist[index].getPath())
+        if track_id:
+            track_ids.append(track_id)
+    return track_ids
+
+
+def _fetch_liked_state(sp, track_id: str) -> bool:
+    """Look up the track's liked state, prefetching the uncached queued tracks with it."""
+    track_ids = [track_id]
+    for queued_id in dict.fromkeys(_queued_track_ids(_LIKED_BATCH_SIZE)):
+        if queued_id != track_id and get_cached_liked_state(queued_id) is None:
+            track_ids.append(queued_id)
+    batch = track_ids[:_LIKED_BATCH_SIZE]
+    states = dict(zip(batch, sp.current_user_saved_tracks_contains(batch) or []))
+    cache_liked_states(states)
+    return states.get(track_id, False)
+
+
 def _clear_artist_fanart_rotation() -> None:
     global _artist_fanart_urls, _artist_fanart_index
     _artist_fanart_urls = []
@@ -130,6 +291,7 @@ class _SpotifyOSDPlayerMonitor(xbmc.Player):
     def _clear(self) -> None:
         global _liked_state_track_id
         _liked_state_track_id = ""
+        clear_liked_states()
         _clear_artist_fanart_rotation()
         win = xbmcgui.Window(ADDON_WINDOW_ID)
         win.clearProperty("Spotify.CurrentTrackId")
@@ -148,51 +310,43 @@ class _SpotifyOSDPlayerMonitor(xbmc.Player):
         # If a non-Spotify item starts playing, clear the Spotify OSD state.
         # Give Kodi a moment to populate MusicPlayer properties.
         def _check():
-            xbmc.sleep(500)
             track_id = xbmc.getInfoLabel("MusicPlayer.Property(spotifytrackid)")
             if not track_id:
                 self._clear()
 
-        threading.Thread(target=_check, daemon=True).start()
+        timer = threading.Timer(0.5, _check)
+        timer.daemon = True
+        timer.start()
 
 
 class MainService:
     def __init__(self):
-        log_msg(
-            f"Spotify plugin version: {xbmcaddon.Addon(id=ADDON_ID).getAddonInfo('version')}."
-        )
+        log_msg(f"Spotify plugin version: {get_addon().getAddonInfo('version')}.")
 
         self.__spotty_helper: SpottyHelper = SpottyHelper()
         self.__spotty = spotty.get_spotty(self.__spotty_helper)
 
         self.__spotty_auth: SpottyAuth = SpottyAuth(self.__spotty)
-        self.__auth_token_expires_at = ""
+        # Token expiry as epoch seconds; None until a token has been obtained.
+        self.__auth_token_expires_at: Optional[int] = None
+        # When to renew: three quarters into the token's lifetime, so a token handed
+        # to a background call never expires while that call is in flight.
+        self.__auth_token_renew_at = 0
         self.__welcome_msg = True
 
-        normalization_setting = (
-            (SPOTIFY_ADDON.getSetting("spotify_normalization") or "auto")
-            .strip()
-            .lower()
-        )
-        if normalization_setting not in ("off", "auto", "track", "album"):
-            normalization_setting = "auto"
-        use_autoplay = SPOTIFY_ADDON.getSetting("spotify_autoplay").lower() == "true"
-        bitrate = self._get_bitrate_setting()
-        self.__prebuffer_enabled = (
-            SPOTIFY_ADDON.getSetting("prebuffer_enabled").lower() == "true"
-        )
+        self.__settings: _ServiceSettings = _read_settings()
         self.__prebuffer_manager: PrebufferManager = PrebufferManager(
             self.__spotty,
-            normalization_gain_type=normalization_setting,
-            bitrate=bitrate,
+            normalization_gain_type=self.__settings.normalization,
+            bitrate=self.__settings.bitrate,
         )
         self.__http_spotty_streamer: HTTPSpottyAudioStreamer = HTTPSpottyAudioStreamer(
             self.__spotty,
-            normalization_gain_type=normalization_setting,
+            normalization_gain_type=self.__settings.normalization,
             prebuffer_manager=self.__prebuffer_manager,
             on_track_started_callback=self.__on_track_started,
-            use_autoplay=use_autoplay,
-            bitrate=bitrate,
+            use_autoplay=self.__settings.autoplay,
+            bitrate=self.__settings.bitrate,
         )
         self.__http_spotty_streamer.set_notify_track_finished(self.__on_track_finished)
 
@@ -206,19 +360,37 @@ class MainService:
         self._prebuffer_token = 0
         self._prebuffer_token_lock = threading.Lock()
 
+        # Last track passed to __on_track_started and when (monotonic). Kodi re-opens
+        # the same URL from the start while buffering; those repeats are ignored.
+        self._last_started_track_id = ""
+        self._last_started_ts = 0.0
+
+        _monitor.settings_changed_handler = self.__on_settings_changed
+
         bottle_manager.route_all(self.__http_spotty_streamer)
 
     def __on_track_started(self, track_id: str, duration_sec: float) -> None:
         """Set OSD properties for Spotify track; pre-buffer next; broadcast to service.nexttrack."""
         global _artist_fanart_urls, _artist_fanart_index, _liked_state_track_id
+        now = time.monotonic()
+        if (
+            track_id == self._last_started_track_id
+            and now - self._last_started_ts < _TRACK_START_DEBOUNCE_SECS
+        ):
+            log_msg(f"Ignoring repeated track start for {track_id}.", LOGDEBUG)
+            return
+        self._last_started_track_id = track_id
+        self._last_started_ts = now
+
         win = xbmcgui.Window(ADDON_WINDOW_ID)
-        win.setProperty("Spotify.CurrentTrackId", track_id or "")
         # Only reset and re-query the liked state when the track actually changes.
         # Kodi issues fresh Range: bytes=0- requests for the same track during buffering,
-        # which would otherwise wipe a user-toggled liked state mid-play.
+        # which would otherwise wipe a user-toggled liked state mid-play. Those repeats
+        # also leave the window properties untouched, saving the Kodi binding calls.
         track_changed = track_id != _liked_state_track_id
         if track_changed:
             _liked_state_track_id = track_id
+            win.setProperty("Spotify.CurrentTrackId", track_id or "")
             win.setProperty("Spotify.CurrentTrackLiked", "")
 
         def _fetch_artist_fanart_urls():
@@ -227,33 +399,17 @@ class MainService:
                 token = get_cached_auth_token()
                 if not token:
                     return
-                sp = spotipy.Spotify(auth=token)
-                track = sp.track(track_id)
-                artists = (track or {}).get("artists") or []
-                if not artists:
-                    return
-                artist_id = artists[0].get("id")
-                if not artist_id:
-                    return
-                artist = sp.artist(artist_id)
-                images = (artist or {}).get("images") or []
-                # Spotify returns same image in multiple sizes (640, 300, 64); use only largest
-                if not images:
-                    return
-                largest_url = images[0].get("url") or ""
+                largest_url = _get_track_artist_image_url(get_spotify_client(token), track_id)
                 if not largest_url:
                     return
                 _artist_fanart_urls.clear()
                 _artist_fanart_urls.append(largest_url)
                 _artist_fanart_index = 0
-                w = xbmcgui.Window(ADDON_WINDOW_ID)
-                w.setProperty("Spotify.ArtistFanartCurrent", largest_url)
-            except Exception:
+                win.setProperty("Spotify.ArtistFanartCurrent", largest_url)
+            except spotify_api_errors():
                 _artist_fanart_urls.clear()
                 _artist_fanart_index = 0
 
-        threading.Thread(target=_fetch_artist_fanart_urls, daemon=True).start()
-
         def _set_liked_state():
             try:
                 token = get_cached_auth_token()
@@ -263,49 +419,50 @@ class MainService:
                         LOGWARNING,
                     )
                     return
-                sp = spotipy.Spotify(auth=token)
-                result = sp.current_user_saved_tracks_contains([track_id])
-                liked = "true" if (result and result[0]) else ""
-                if liked:
-                    win.setProperty("Spotify.CurrentTrackLiked", liked)
-                else:
-                    win.clearProperty("Spotify.CurrentTrackLiked")
-                log_msg(
-                    f"Spotify.CurrentTrackLiked = {liked!r} for {track_id}.", LOGDEBUG
-                )
-            except Exception as e:
+                liked = _fetch_liked_state(get_spotify_client(token), track_id)
+                _show_liked_state(liked)
+            except spotify_api_errors() as e:
                 log_msg(f"Error setting liked state for {track_id}: {e}", LOGWARNING)
-                pass
 
-        # Only run the liked state check when the track actually changes.
+        def _show_liked_state(liked: bool):
+            if liked:
+                win.setProperty("Spotify.CurrentTrackLiked", "true")
+            else:
+                win.clearProperty("Spotify.CurrentTrackLiked")
+            log_msg(f"Spotify.CurrentTrackLiked = {liked!r} for {track_id}.", LOGDEBUG)
+
+        # Only run the liked state check when the track actually changes. A track
+        # prefetched with an earlier batch is shown right away; otherwise the lookup
+        # is queued ahead of the fanart lookup: one API call that drives the Like
+        # button, versus two calls for a background image.
         if track_changed:
-            threading.Thread(target=_set_liked_state, daemon=True).start()
+            cached_liked = get_cached_liked_state(track_id)
+            if cached_liked is None:
+                _submit_work(_set_liked_state)
+            else:
+                _show_liked_state(cached_liked)
+        _submit_work(_fetch_artist_fanart_urls)
 
         try:
-            current_item, next_item = get_next_playlist_item()
+            _, next_item = get_next_playlist_item(properties=("file",))
             if not next_item:
-                if SPOTIFY_ADDON.getSetting("spotify_autoplay").lower() == "true":
-                    threading.Thread(
-                        target=self.__queue_autoplay_tracks,
-                        args=(track_id,),
-                        daemon=True,
-                    ).start()
+                if self.__settings.autoplay:
+                    _submit_work(self.__queue_autoplay_tracks, track_id)
                 return
 
             next_track_id, next_duration = parse_track_url(next_item.get("file") or "")
             if not next_track_id or next_duration is None:
                 return
 
-            prebuffer_enabled = (
-                SPOTIFY_ADDON.getSetting("prebuffer_enabled").lower() == "true"
-            )
+            _submit_work(_prefetch_track_artist_image, next_track_id)
+
             # Prebuffer collects PCM bytes for the next track. Pass current
             # settings so prebuffer uses them without addon restart.
             # IMPORTANT: Delay prebuffer start so the main track's spotty process
             # has time to connect to Spotify first. Spotty uses a single Spotify
             # connection per account — starting the prebuffer's spotty immediately
             # causes it to compete with the main spotty, making both fail.
-            if prebuffer_enabled:
+            if self.__settings.prebuffer_enabled:
                 with self._prebuffer_token_lock:
                     self._prebuffer_token += 1
                     my_token = self._prebuffer_token
@@ -316,9 +473,6 @@ class MainService:
                     # while the main track is still downloading kicks the main stream.
                     from spotty_cache import SpottyCacheManager
 
-                    # Wait for the main downloader to register and start.
-                    time.sleep(2.0)
-
                     # During a cascade, many _deferred_prebuffer threads are spawned
                     # in quick succession (one per skipped track).  Only the most
                     # recent one should proceed — older threads would call get_or_start
@@ -354,7 +508,9 @@ class MainService:
                     # 1s was insufficient (~1.3s total gap still caused 0-byte
                     # prebuffers); 2s gives enough margin for session release.
                     # 15s provides ample room for error on slow connections.
-                    time.sleep(15.0)
+                    # Wait on the monitor so addon shutdown does not sit behind it.
+                    if abort_app(15):
+                        return
 
                     # Final stale-check after the session-release sleep.
                     with self._prebuffer_token_lock:
@@ -371,7 +527,7 @@ class MainService:
                     # advanced yet, so the captured "next" is wrong (it is
                     # the current track or even the previous one).
                     try:
-                        _, next_item_now = get_next_playlist_item()
+                        _, next_item_now = get_next_playlist_item(properties=("file",))
                     except Exception:
                         return
                     if not next_item_now:
@@ -392,22 +548,20 @@ class MainService:
                         )
                         return
 
-                    bitrate = self._get_bitrate_setting()
-                    norm = (
-                        (SPOTIFY_ADDON.getSetting("spotify_normalization") or "auto")
-                        .strip()
-                        .lower()
-                    )
-                    if norm not in ("off", "auto", "track", "album"):
-                        norm = "auto"
+                    settings = self.__settings
                     self.__prebuffer_manager.start_prebuffer(
                         next_id_now,
                         next_dur_now,
-                        bitrate=bitrate,
-                        normalization_gain_type=norm,
+                        bitrate=settings.bitrate,
+                        normalization_gain_type=settings.normalization,
                     )
 
-                threading.Thread(target=_deferred_prebuffer, daemon=True).start()
+                # Give the main downloader 2s to register and start before checking
+                # on it. The Timer is still a (daemon) thread sleeping out the delay;
+                # the worker body itself no longer sleeps before its first check.
+                timer = threading.Timer(2.0, _deferred_prebuffer)
+                timer.daemon = True
+                timer.start()
 
         except Exception:
             pass
@@ -420,7 +574,7 @@ class MainService:
                 log_msg("Autoplay: no auth token available.", LOGWARNING)
                 return
 
-            sp = spotipy.Spotify(auth=token)
+            sp = get_spotify_client(token)
 
             # Fetch a larger set of recommendations to fill the autoplay playlist.
             RECOMMEND_LIMIT = 49
@@ -596,40 +750,41 @@ class MainService:
 
         self.__renew_token()
 
-        loop_counter = 0
-        loop_wait_in_secs = 6
         while True:
-            loop_counter += 1
-            if (loop_counter % 10) == 0:
-                log_msg(f"Main loop continuing. Loop counter: {loop_counter}.")
-
-            prebuffer_enabled_now = (
-                SPOTIFY_ADDON.getSetting("prebuffer_enabled").lower() == "true"
-            )
-            if self.__prebuffer_enabled and not prebuffer_enabled_now:
-                self.__prebuffer_manager.cancel_prebuffer()
-            self.__prebuffer_enabled = prebuffer_enabled_now
-
-            if self.__auth_token_expires_at == "":
+            time_now = int(time.time())
+            if self.__auth_token_expires_at is None:
                 log_msg("Spotify not yet authorized. Refreshing auth token now.")
                 self.__renew_token()
-            elif (int(self.__auth_token_expires_at) - 60) <= int(time.time()):
-                expire_time = int(self.__auth_token_expires_at)
-                time_now = int(time.time())
+            elif self.__auth_token_renew_at <= time_now:
+                expire_time = self.__auth_token_expires_at
                 log_msg(
-                    f"Spotify token expired."
+                    f"Spotify token due for renewal."
                     f" Expire time: {utils.get_time_str(expire_time)} ({expire_time});"
                     f" time now: {utils.get_time_str(time_now)} ({time_now})."
                     f" Refreshing auth token now."
                 )
                 self.__renew_token()
 
+            # Nothing else is polled here (settings changes arrive via the monitor),
+            # so sleep until the token is due for renewal, at most a minute at a time.
+            if self.__auth_token_expires_at is None:
+                loop_wait_in_secs = _AUTH_RETRY_SECS
+            else:
+                loop_wait_in_secs = self.__auth_token_renew_at - int(time.time())
+                loop_wait_in_secs = max(1, min(loop_wait_in_secs, _MAX_LOOP_WAIT_SECS))
+
             if abort_app(loop_wait_in_secs):
                 log_msg("Aborting the main service.")
                 break
 
         self.__close()
 
+    def __on_settings_changed(self) -> None:
+        previous = self.__settings
+        self.__settings = _read_settings()
+        if previous.prebuffer_enabled and not self.__settings.prebuffer_enabled:
+            self.__prebuffer_manager.cancel_prebuffer()
+
     def __close(self) -> None:
         log_msg("Shutdown requested.")
         from spotty_cache import SpottyCacheManager
@@ -639,28 +794,29 @@ class MainService:
         self.__http_spotty_streamer.stop()
         self.__spotty_helper.kill_all_spotties()
         bottle_manager.stop_thread()
+        # Last, so the HTTP server and Kodi callbacks above cannot submit to a closed pool.
+        _background.shutdown(wait=False)
         log_msg("Main service stopped.")
 
-    @staticmethod
-    def _get_bitrate_setting() -> str:
-        """Return the bitrate setting string, validated to one of '96', '160', '320'."""
-        v = (SPOTIFY_ADDON.getSetting("spotify_bitrate") or "320").strip()
-        return v if v in ("96", "160", "320") else "320"
-
     def __renew_token(self) -> None:
         try:
             self.__spotty_auth.renew_token()
-            self.__auth_token_expires_at = utils.get_cached_auth_token_expires_at()
+            expires_at = utils.get_cached_auth_token_expires_at()
+            self.__auth_token_expires_at = int(expires_at) if expires_at else None
+            if self.__auth_token_expires_at is not None:
+                time_now = int(time.time())
+                lifetime = self.__auth_token_expires_at - time_now
+                self.__auth_token_renew_at = time_now + max(30, lifetime * 3 // 4)
             if self.__welcome_msg:
                 self.__welcome_msg = False
                 self.__show_welcome_notification()
         except Exception as exc:
             log_exception(exc, "Could not renew Spotify auth token")
-            self.__auth_token_expires_at = ""
+            self.__auth_token_expires_at = None
 
     def __show_welcome_notification(self) -> None:
         try:
-            addon = xbmcaddon.Addon(id=ADDON_ID)
+            addon = get_addon()
             addon_name = addon.getAddonInfo("name")
             username = utils.get_username()
             welcome = addon.getLocalizedString(WELCOME_AUTHENTICATED_STR_ID)
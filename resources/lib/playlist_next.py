@@ -9,6 +9,7 @@ the current and next queued track and to parse our stream URLs.
 """
 from __future__ import absolute_import, unicode_literals
 
+import functools
 import json
 import re
 
@@ -20,6 +21,9 @@ from xbmc import LOGDEBUG
 # Kodi music playlist id
 PLAYLIST_MUSIC = 0
 
+# Item properties requested from Playlist.GetItems unless the caller narrows them.
+PLAYLIST_ITEM_PROPERTIES = ("art", "file", "title", "duration", "artist", "album")
+
 # URL pattern for our track endpoint: http://127.0.0.1:PORT/track/TRACK_ID/DURATION.wav
 # Also matches legacy localhost URLs and optional .wav suffix for backwards compat.
 _TRACK_URL_PATTERN = re.compile(
@@ -27,6 +31,10 @@ _TRACK_URL_PATTERN = re.compile(
     re.I,
 )
 
+# Playerid of Kodi's audio player. It stays the same while music plays, so it is
+# looked up once and only re-queried when a Player.GetProperties call fails.
+_cached_audio_playerid = None
+
 
 def _jsonrpc(**kwargs):
     """Execute Kodi JSON-RPC. Returns parsed result or None on error."""
@@ -53,32 +61,48 @@ def _get_active_audio_player_id():
     return None
 
 
-def _get_current_playlist_position():
-    """Return (playerid, position) for current item in music playlist, or (None, None)."""
-    playerid = _get_active_audio_player_id()
-    if playerid is None:
-        return None, None
+def _get_player_position(playerid):
+    """Return the position property of the given player, or None if the call fails."""
     result = _jsonrpc(
         method="Player.GetProperties",
         params={"playerid": playerid, "properties": ["position"]},
     )
     if not result or "result" not in result:
-        return playerid, None
-    pos = result.get("result", {}).get("position")
-    return playerid, pos if pos is not None else None
+        return None
+    return result.get("result", {}).get("position")
+
+
+def _get_current_playlist_position():
+    """Return (playerid, position) for current item in music playlist, or (None, None)."""
+    global _cached_audio_playerid
+    playerid = _cached_audio_playerid
+    if playerid is not None:
+        pos = _get_player_position(playerid)
+        if pos is not None:
+            return playerid, pos
+        # The cached player went away; rediscover it once before giving up.
+        _cached_audio_playerid = None
+    playerid = _get_active_audio_player_id()
+    if playerid is None:
+        return None, None
+    pos = _get_player_position(playerid)
+    if pos is not None:
+        _cached_audio_playerid = playerid
+    return playerid, pos
 
 
-def _get_playlist_items(start_index, end_index):
+def _get_playlist_items(start_index, end_index, properties=PLAYLIST_ITEM_PROPERTIES):
     """
     Return list of playlist items for music playlist between start_index and end_index.
-    Each item has 'file', 'label', 'title', 'art', etc.
+    Each item has 'label' plus the requested properties ('file', 'title', 'art', etc.).
+    Kodi serializes every requested property, so ask only for what will be read.
     """
     result = _jsonrpc(
         method="Playlist.GetItems",
         params={
             "playlistid": PLAYLIST_MUSIC,
             "limits": {"start": start_index, "end": end_index},
-            "properties": ["art", "file", "title", "duration", "artist", "album"],
+            "properties": list(properties),
         },
     )
     if not result or "result" not in result:
@@ -87,10 +111,12 @@ def _get_playlist_items(start_index, end_index):
     return items if items else []
 
 
+@functools.lru_cache(maxsize=256)
 def parse_track_url(file_url):
     """
     Parse our track URL into (track_id, duration_sec).
     Returns (None, None) if not our URL or parse fails.
+    Memoized: the same URLs come round as "next" and then as "current".
     """
     if not file_url:
         return None, None
@@ -105,7 +131,7 @@ def parse_track_url(file_url):
         return None, None
 
 
-def get_next_playlist_item():
+def get_next_playlist_item(properties=PLAYLIST_ITEM_PROPERTIES):
     """
     Get the next item in the music playlist (current position + 1).
     Returns (current_item, next_item) as playlist item dicts, or (None, None) if not available.
@@ -114,7 +140,7 @@ def get_next_playlist_item():
     if position is None:
         return None, None
     # current = position, next = position + 1
-    items = _get_playlist_items(position, position + 2)
+    items = _get_playlist_items(position, position + 2, properties)
     current_item = items[0] if len(items) > 0 else None
     next_item = items[1] if len(items) > 1 else None
     return current_item, next_item
@@ -4,7 +4,8 @@ import sys
 import threading
 import time
 import urllib.parse
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 import simplecache
 import spotipy
@@ -50,6 +51,12 @@ Playlist = Dict[str, Union[str, Dict[str, List[Any]]]]
 
 DO_CACHE_LOGGING = False
 
+# Local proxy endpoint every track ListItem plays from: <prefix><track_id>/<duration>.wav
+_TRACK_URL_PREFIX = f"http://{PROXY_HOST}:{PROXY_PORT}/track/"
+
+# Most Web API batch requests kept in flight at once when fetching ids in chunks.
+_CHUNK_FETCH_WORKERS = 4
+
 
 def cache_log(msg) -> None:
     if DO_CACHE_LOGGING:
@@ -62,6 +69,18 @@ def _get_len(items) -> int:
     return len(items)
 
 
+def _fetch_in_chunks(
+    fetch: Callable[[List[str]], List[Any]], ids: List[str], chunk_size: int
+) -> List[Any]:
+    """Call fetch on each chunk_size batch of ids, several batches at a time, and return the
+    concatenated results in the order of ids."""
+    chunks = get_chunks(ids, chunk_size)
+    if len(chunks) <= 1:
+        return [item for chunk in chunks for item in fetch(chunk)]
+    with ThreadPoolExecutor(max_workers=min(_CHUNK_FETCH_WORKERS, len(chunks))) as pool:
+        return [item for items in pool.map(fetch, chunks) for item in items]
+
+
 def _art_for_item(thumb_url: str, fallback_icon_path: str = None) -> Dict[str, str]:
     """Build full Kodi art dict (thumb, poster, fanart, icon) so every view shows art."""
     url = thumb_url or ""
@@ -104,7 +123,7 @@ def _art_for_track(
 
 
 class PluginContent:
-    __addon: xbmcaddon.Addon = xbmcaddon.Addon(id=ADDON_ID)
+    __addon: xbmcaddon.Addon = utils.get_addon()
     __win: xbmcgui.Window = xbmcgui.Window(utils.ADDON_WINDOW_ID)
     __addon_icon_path = os.path.join(
         xbmcvfs.translatePath(__addon.getAddonInfo("path")), "resources"
@@ -271,37 +290,39 @@ class PluginContent:
     def parse_params(self):
         """parse parameters from the plugin entry path"""
         log_msg(f"sys.argv = {str(sys.argv)}")
-        self.__params: Dict[str, Any] = urllib.parse.parse_qs(sys.argv[2][1:])
+        # Every plugin parameter is single-valued, so skip parse_qs's per-key value lists.
+        query = sys.argv[2][1:]
+        self.__params: Dict[str, str] = dict(urllib.parse.parse_qsl(query)) if query else {}
 
         action = self.__params.get("action", None)
         if action:
-            self.__action = action[0].lower()
+            self.__action = action.lower()
             log_msg(f"Set action to '{self.__action}'.")
 
         playlist_id = self.__params.get("playlistid", None)
         if playlist_id:
-            self.__playlist_id = playlist_id[0]
+            self.__playlist_id = playlist_id
         owner_id = self.__params.get("ownerid", None)
         if owner_id:
-            self.__owner_id = owner_id[0]
+            self.__owner_id = owner_id
         track_id = self.__params.get("trackid", None)
         if track_id:
-            self.__track_id = track_id[0]
+            self.__track_id = track_id
         album_id = self.__params.get("albumid", None)
         if album_id:
-            self.__album_id = album_id[0]
+            self.__album_id = album_id
         artist_id = self.__params.get("artistid", None)
         if artist_id:
-            self.__artist_id = artist_id[0]
+            self.__artist_id = artist_id
         artist_name = self.__params.get("artistname", None)
         if artist_name:
-            self.__artist_name = artist_name[0]
+            self.__artist_name = artist_name
         offset = self.__params.get("offset", None)
         if offset:
-            self.__offset = int(offset[0])
+            self.__offset = int(offset)
         filt = self.__params.get("applyfilter", None)
         if filt:
-            self.__filter = filt[0]
+            self.__filter = filt
 
     _ALLOWED_ACTIONS = frozenset(
         {
@@ -366,13 +387,17 @@ class PluginContent:
         """
         result = self.__cached_checksum
         if not result:
-            saved_tracks = self.__get_saved_track_ids()
-            saved_albums = self.__get_saved_album_ids()
-            followed_artists = self.__get_followed_artists()
+            # Only the library sizes matter here, so ask each paging endpoint for its total
+            # instead of paging through (and caching) every saved id.
+            saved_tracks = self.__spotipy.current_user_saved_tracks(limit=1)["total"]
+            saved_albums = self.__spotipy.current_user_saved_albums(limit=1)["total"]
+            followed_artists = self.__spotipy.current_user_followed_artists(limit=1)["artists"][
+                "total"
+            ]
             generic_checksum = self.__addon.getSetting("cache_checksum")
             result = (
                 f"v{CACHE_SCHEMA_VERSION}"
-                f"-{len(saved_tracks)}-{len(saved_albums)}-{len(followed_artists)}"
+                f"-{saved_tracks}-{saved_albums}-{followed_artists}"
                 f"-{generic_checksum}"
             )
             self.__cached_checksum = result
@@ -393,8 +418,7 @@ class PluginContent:
 
     def delete_cache_db(self) -> None:
         log_msg("Deleting plugin cache...")
-        simple_db_cache_addon = xbmcaddon.Addon(ADDON_ID)
-        db_path = simple_db_cache_addon.getAddonInfo("profile")
+        db_path = self.__addon.getAddonInfo("profile")
         db_file = xbmcvfs.translatePath(f"{db_path}/simplecache.db")
         try:
             os.remove(db_file)
@@ -467,12 +491,9 @@ class PluginContent:
     def __get_track_list(
         self, tracks, append_artist_to_label: bool = False
     ) -> List[Tuple[str, xbmcgui.ListItem, bool]]:
-        result = []
-        for track in tracks:
-            item = self.__get_track_item(track, append_artist_to_label)
-            if item is not None:
-                result.append(item + (False,))
-        return result
+        get_track_item = self.__get_track_item
+        items = (get_track_item(track, append_artist_to_label) for track in tracks)
+        return [(url, li, False) for url, li in filter(None, items)]
 
     def _track_album_description(
         self, track: Dict[str, Any], album: Dict[str, Any]
@@ -543,17 +564,15 @@ class PluginContent:
         # Raw API track has "artists" list; ensure "artist" string exists for label/tag
         if not track.get("artist") and track.get("artists"):
             track = dict(track)
-            track["artist"] = " / ".join(
-                a.get("name", "") for a in track["artists"] if a.get("name")
-            )
+            track["artist"] = " / ".join(filter(None, (a.get("name") for a in track["artists"])))
         duration_sec = max(1, math.ceil((track.get("duration_ms") or 0) / 1000))
         label = self.__get_track_name(track, append_artist_to_label)
         title = track["name"]
-        album = track.get("album") or {}
-        album_name = (album.get("name") or "") if isinstance(album, dict) else ""
-        release_date = (
-            (album.get("release_date") or "") if isinstance(album, dict) else ""
-        )
+        album = track.get("album")
+        if not isinstance(album, dict):
+            album = {}
+        album_name = album.get("name") or ""
+        release_date = album.get("release_date") or ""
         year = int(track.get("year") or 0)
         genre = track.get("genre")
         genres_list = []
@@ -564,7 +583,7 @@ class PluginContent:
                 genres_list = [str(g) for g in genre if g]
 
         # Local playback by using proxy on this machine.
-        url = f"http://{PROXY_HOST}:{PROXY_PORT}/track/{track['id']}/{duration_sec}.wav"
+        url = f"{_TRACK_URL_PREFIX}{track['id']}/{duration_sec}.wav"
 
         li = xbmcgui.ListItem(label, offscreen=True)
         li.setProperty("isPlayable", "true")
@@ -587,7 +606,7 @@ class PluginContent:
             tag.setReleaseDate(release_date)
         if genres_list:
             tag.setGenres(genres_list)
-        if isinstance(album, dict) and album.get("album_type") == "compilation":
+        if album.get("album_type") == "compilation":
             tag.setAlbumArtist("Various Artists")
 
         # Additional song info from Spotify only (OSD/skin)
@@ -1032,7 +1051,8 @@ class PluginContent:
                 f' for "{playlist["name"]}".'
             )
         else:
-            # Get listing from api.
+            # Get listing from api. Only each item's "track" object is read, so skip the
+            # page envelope and the added_at/added_by data; 100 is the endpoint's max page size.
             count = 0
             playlist_details = playlist
             playlist_details["tracks"]["items"] = []
@@ -1040,11 +1060,11 @@ class PluginContent:
                 playlist_details["tracks"]["items"] += self.__spotipy.playlist_items(
                     playlist["id"],
                     market=self.__user_country,
-                    fields="",
-                    limit=50,
+                    fields="items(track)",
+                    limit=100,
                     offset=count,
                 )["items"]
-                count += 50
+                count += 100
             playlist_details["tracks"]["items"] = self.__prepare_track_listitems(
                 tracks=playlist_details["tracks"]["items"], playlist_details=playlist
             )
@@ -1374,11 +1394,11 @@ class PluginContent:
 
         # For tracks, we always get the full details unless full tracks already supplied.
         if track_ids and not tracks:
-            # Add early exit condition
-            for chunk in get_chunks(track_ids, 20):
-                tracks += self.__spotipy.tracks(chunk, market=self.__user_country)[
-                    "tracks"
-                ]
+            tracks += _fetch_in_chunks(
+                lambda chunk: self.__spotipy.tracks(chunk, market=self.__user_country)["tracks"],
+                track_ids,
+                20,
+            )
 
         if need_saved:
             t_saved.join()
@@ -1410,10 +1430,7 @@ class PluginContent:
                 continue
 
             if "artists" in track:
-                artists = []
-                for artist in track["artists"]:
-                    if artist["name"]:
-                        artists.append(artist["name"])
+                artists = [artist["name"] for artist in track["artists"] if artist["name"]]
                 if artists:
                     track["artist"] = " / ".join(artists)
                     track["artistid"] = track["artists"][0]["id"]
@@ -1424,7 +1441,7 @@ class PluginContent:
             else:
                 track["genre"] = " / ".join(track["album"].get("genres", []))
                 release_date = track["album"].get("release_date") or ""
-                year_str = release_date.split("-")[0] if release_date else ""
+                year_str = release_date.partition("-")[0]
                 track["year"] = int(year_str) if year_str.isdigit() else 0
 
             track["rating"] = int(
@@ -1483,15 +1500,16 @@ class PluginContent:
         if not artist_ids:
             return result
         try:
-            for chunk in get_chunks(artist_ids, 50):
-                artists = self.__spotipy.artists(chunk).get("artists") or []
-                for artist in artists:
-                    if not artist or not artist.get("id"):
-                        continue
-                    images = artist.get("images") or []
-                    if images:
-                        # Spotify: images sorted by width descending; [0]=largest
-                        result[artist["id"]] = images[0].get("url") or ""
+            artists = _fetch_in_chunks(
+                lambda chunk: self.__spotipy.artists(chunk).get("artists") or [], artist_ids, 50
+            )
+            for artist in artists:
+                if not artist or not artist.get("id"):
+                    continue
+                images = artist.get("images") or []
+                if images:
+                    # Spotify: images sorted by width descending; [0]=largest
+                    result[artist["id"]] = images[0].get("url") or ""
         except Exception as e:
             log_exception("artist fanart fetch", e)
         return result
@@ -1637,10 +1655,11 @@ class PluginContent:
             album_ids = []
         if not albums and album_ids:
             # Get full info in chunks of 20.
-            for chunk in get_chunks(album_ids, 20):
-                albums += self.__spotipy.albums(chunk, market=self.__user_country)[
-                    "albums"
-                ]
+            albums += _fetch_in_chunks(
+                lambda chunk: self.__spotipy.albums(chunk, market=self.__user_country)["albums"],
+                album_ids,
+                20,
+            )
 
         saved_albums = self.__get_saved_album_ids()
 
@@ -1655,10 +1674,9 @@ class PluginContent:
                 {"action": self.browse_album.__name__, "albumid": track["id"]}
             )
 
-            artists = []
-            for artist in track.get("artists") or []:
-                artists.append(artist.get("name", ""))
-            track["artist"] = " / ".join(artists) or ""
+            track["artist"] = " / ".join(
+                filter(None, (artist.get("name") for artist in track.get("artists") or []))
+            )
             track["genre"] = " / ".join(track.get("genres") or [])
             release_date = (track.get("release_date") or "")[:4]
             track["year"] = int(release_date) if release_date.isdigit() else 0
@@ -2179,9 +2197,11 @@ class PluginContent:
                 for artist in item["artists"]:
                     if artist["id"] not in all_artist_ids:
                         all_artist_ids.append(artist["id"])
-            for chunk in get_chunks(all_artist_ids, 50):
+            if all_artist_ids:
                 artists += self.__prepare_artist_listitems(
-                    self.__spotipy.artists(chunk)["artists"]
+                    _fetch_in_chunks(
+                        lambda chunk: self.__spotipy.artists(chunk)["artists"], all_artist_ids, 50
+                    )
                 )
             for artist in followed_artists:
                 if not artist["id"] in all_artist_ids:
@@ -2413,13 +2433,8 @@ class PluginContent:
         if list_total <= self.__offset + self.__limit:
             return
         params = dict(self.__params)
-        params["offset"] = [str(self.__offset + self.__limit)]
-        flat = {}
-        for key, value in params.items():
-            flat[key] = (
-                value[0] if isinstance(value, (list, tuple)) and value else value
-            )
-        url = self.__build_url(flat)
+        params["offset"] = str(self.__offset + self.__limit)
+        url = self.__build_url(params)
 
         li = xbmcgui.ListItem(xbmc.getLocalizedString(KODI_NEXT_PAGE_STR_ID), path=url)
         li.setProperty("do_not_analyze", "true")
@@ -14,7 +14,7 @@ from typing import Optional, Tuple
 
 from spotty import Spotty
 from spotty_cache import SpottyCacheManager
-from spotty_audio_streamer import create_wav_header_for_duration
+from spotty_audio_streamer import create_wav_header_for_duration, sanitize_normalization
 from utils import log_msg
 from xbmc import LOGDEBUG
 
@@ -49,9 +49,7 @@ class PrebufferManager:
     ) -> None:
         """Start filling the pre-buffer for the given track in a background thread."""
         br = bitrate if bitrate is not None else self.__bitrate
-        norm = (normalization_gain_type or self.__normalization_gain_type).strip().lower() or "auto"
-        if norm not in ("off", "auto", "track", "album"):
-            norm = "auto"
+        norm = sanitize_normalization(normalization_gain_type or self.__normalization_gain_type)
         
         with self.__lock:
             if self.__prebuffer_track_id == track_id:
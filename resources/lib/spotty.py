@@ -1,6 +1,6 @@
 import os
 import subprocess
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import xbmc
 from xbmc import LOGDEBUG, LOGERROR
@@ -9,8 +9,9 @@ from spotty_helper import SpottyHelper
 from utils import log_msg, ADDON_DATA_PATH
 
 SPOTTY_PLAYER_NAME = "Kodi-Spotty"
+# No "--verbose": run_spotty() sends stderr to DEVNULL, so verbose logging would
+# only make spotty format and write lines that nobody reads.
 SPOTTY_DEFAULT_ARGS = [
-    "--verbose",
     "--name",
     SPOTTY_PLAYER_NAME,
 ]
@@ -41,7 +42,7 @@ class Spotty:
             self.__playback_supported = False
             log_msg("Error while verifying spotty. Local playback is disabled.", loglevel=LOGERROR)
 
-    def set_spotty_env(self, env: Dict[str, str]):
+    def set_spotty_env(self, env: Optional[Dict[str, str]]):
         self.__spotty_rust_env = env
 
     def get_spotty_token_file(self) -> str:
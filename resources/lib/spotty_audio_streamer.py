@@ -17,16 +17,22 @@ SPOTIFY_TRACK_PREFIX = "spotify:track:"
 SPOTIFY_BITRATE = "320"
 _VALID_BITRATES = ("96", "160", "320")
 _VALID_GAIN_TYPES = ("auto", "track", "album")
+_VALID_NORMALIZATIONS = ("off",) + _VALID_GAIN_TYPES
 _DEFAULT_GAIN_TYPE = "track"
+_DEFAULT_NORMALIZATION = "auto"
 
 # Maximum bytes of PCM silence to pad at the end of a stream when spotty exits
 # cleanly but short of the WAV-declared length. 10 seconds @ 176400 B/s = 1,764,000.
 # Duration mismatches between the declared track length and spotty's actual output
 # are typically < 10 s; larger gaps indicate a real error and should not be masked.
 _SILENCE_PADDING_MAX_BYTES = 176400 * 10
+# Smallest chunk handed to the HTTP layer while the download is still running.
+# spotty delivers PCM in small pipe reads; waiting for this much avoids writing
+# a stream of tiny chunks to the socket when the reader has caught up.
+_MIN_CHUNK_BYTES = 65536
 
 
-def _clamp_volume(value: int) -> int:
+def clamp_volume(value: int) -> int:
     """Clamp volume to 1-100 for spotty --initial-volume."""
     try:
         v = int(value)
@@ -35,6 +41,17 @@ def _clamp_volume(value: int) -> int:
         return 35
 
 
+def sanitize_bitrate(value: str) -> str:
+    """Return the bitrate setting if spotty accepts it, else the default (320)."""
+    v = (value or SPOTIFY_BITRATE).strip()
+    return v if v in _VALID_BITRATES else SPOTIFY_BITRATE
+
+
+def sanitize_normalization(value: str) -> str:
+    """Return the normalization setting lower-cased if valid (off/auto/track/album), else 'auto'."""
+    v = (value or _DEFAULT_NORMALIZATION).strip().lower()
+    return v if v in _VALID_NORMALIZATIONS else _DEFAULT_NORMALIZATION
+
 
 def _get_kodi_chunk_size() -> int:
     """Dynamically get the user's chunk size setting from Kodi (cache.chunksize).
@@ -64,7 +81,7 @@ class SpottyAudioStreamer:
 
     def __init__(self, spotty: Spotty, initial_volume: int = 35):
         self.__spotty = spotty
-        self.initial_volume = _clamp_volume(initial_volume)
+        self.initial_volume = clamp_volume(initial_volume)
         self.chunk_size = _get_kodi_chunk_size()
 
         self.__track_id: str = ""
@@ -82,7 +99,7 @@ class SpottyAudioStreamer:
 
     def set_initial_volume(self, value: int) -> None:
         """Set volume (1–100) for the next spotty run."""
-        self.initial_volume = _clamp_volume(value)
+        self.initial_volume = clamp_volume(value)
 
     def get_track_length(self) -> int:
         """Total byte length of the WAV stream (header + PCM) for the current track."""
@@ -207,7 +224,8 @@ class SpottyAudioStreamer:
 
         try:
             while bytes_sent < range_len and not self.__terminated:
-                target_bytes_in_buf = buf_offset + bytes_sent + 1
+                want = min(_MIN_CHUNK_BYTES, range_len - bytes_sent)
+                target_bytes_in_buf = buf_offset + bytes_sent + want
                 downloader.wait_for_bytes(target_bytes_in_buf, timeout=1.0)
 
                 if self.__terminated:
@@ -223,7 +241,12 @@ class SpottyAudioStreamer:
                     if available > 0:
                         to_read = min(self.chunk_size, available, range_len - bytes_sent)
                         read_start = buf_offset + bytes_sent
-                        chunk = bytes(downloader._buffer[read_start: read_start + to_read])
+                        # Slice through a memoryview so the chunk is copied once
+                        # (bytearray slicing would copy into a temporary first).
+                        # The view is released before the lock so the downloader
+                        # can keep growing the buffer.
+                        with memoryview(downloader._buffer) as view:
+                            chunk = bytes(view[read_start: read_start + to_read])
 
                 if chunk:
                     yield chunk
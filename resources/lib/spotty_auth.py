@@ -4,13 +4,12 @@ import subprocess
 import time
 from typing import Dict, Union
 
-import xbmcaddon
 from xbmc import LOGDEBUG, LOGERROR, LOGWARNING
 
 import utils
 from spotty import Spotty, SPOTTY_CACHE_DIR_NAME, SPOTTY_CREDENTIALS_FILENAME
 from string_ids import AUTHENTICATE_FAILED_STR_ID, AUTHENTICATION_PROGRAM_FAILED_STR_ID
-from utils import log_msg, log_exception, ADDON_ID
+from utils import log_msg, log_exception
 
 ZEROCONF_PORT = 10001
 
@@ -75,11 +74,11 @@ class SpottyAuth:
 
     @staticmethod
     def get_zeroconf_program_failed_msg() -> str:
-        return xbmcaddon.Addon(id=ADDON_ID).getLocalizedString(AUTHENTICATION_PROGRAM_FAILED_STR_ID)
+        return utils.get_addon().getLocalizedString(AUTHENTICATION_PROGRAM_FAILED_STR_ID)
 
     @staticmethod
     def get_zeroconf_authentication_failed_msg() -> str:
-        msg = xbmcaddon.Addon(id=ADDON_ID).getLocalizedString(AUTHENTICATE_FAILED_STR_ID)
+        msg = utils.get_addon().getLocalizedString(AUTHENTICATE_FAILED_STR_ID)
         cred_file = f"<ADDON_DATA_DIR>/{SPOTTY_CACHE_DIR_NAME}/{SPOTTY_CREDENTIALS_FILENAME}"
         return f'{msg}\n\n"{cred_file}".'
 
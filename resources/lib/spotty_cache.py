@@ -1,19 +1,11 @@
 import threading
-import time
 
 from spotty import Spotty
+from spotty_audio_streamer import clamp_volume
 from utils import log_exception, log_msg
 from xbmc import LOGDEBUG, LOGERROR, LOGWARNING
 
 
-def _clamp_volume(value: int) -> int:
-    try:
-        v = int(value)
-        return max(1, min(100, v))
-    except (TypeError, ValueError):
-        return 35
-
-
 class SpottyDownloader:
     """Downloads a single track from spotty into an in-memory buffer in the background."""
 
@@ -35,7 +27,7 @@ class SpottyDownloader:
         self.start_byte = start_byte
         self.bitrate = bitrate
         self.normalization = normalization
-        self.volume = _clamp_volume(volume)
+        self.volume = clamp_volume(volume)
         self.wav_header = wav_header
         self.track_length = track_length
 
@@ -119,22 +111,27 @@ class SpottyDownloader:
                     if self.aborted:
                         return
 
+                # readinto1() returns whatever the pipe already holds (one syscall at
+                # most) instead of blocking until the full request size has arrived, so
+                # the abort flag is re-checked as soon as each burst of PCM lands. Reads
+                # land in one reused scratch buffer rather than a new bytes per chunk.
+                read_buf = memoryview(bytearray(65536))
                 if pcm_skip > 0:
                     discarded = 0
                     while discarded < pcm_skip and not self.aborted:
-                        chunk = process.stdout.read(min(8192, pcm_skip - discarded))
-                        if not chunk:
+                        n = process.stdout.readinto1(read_buf[: min(65536, pcm_skip - discarded)])
+                        if not n:
                             break
-                        discarded += len(chunk)
+                        discarded += n
 
                 while not self.aborted:
-                    chunk = process.stdout.read(65536)
-                    if not chunk:
+                    n = process.stdout.readinto1(read_buf)
+                    if not n:
                         break
-                    pcm_bytes_read += len(chunk)
+                    pcm_bytes_read += n
                     with self.cond:
-                        self._buffer.extend(chunk)
-                        self.written_bytes += len(chunk)
+                        self._buffer.extend(read_buf[:n])
+                        self.written_bytes += n
                         self.cond.notify_all()
 
                 if process.poll() is None and not self.aborted:
@@ -230,21 +227,18 @@ class SpottyDownloader:
             self._buffer.clear()
 
     def wait_for_bytes(self, target_bytes: int, timeout: float = None) -> bool:
+        # Every state change (new bytes, finish, error, abort) notifies the condition,
+        # so block until one of them happens rather than waking up once a second.
         with self.cond:
-            start_time = time.time()
-            while (
-                self.written_bytes < target_bytes
-                and not self.is_finished
-                and not self.error
-                and not self.aborted
-            ):
-                if timeout:
-                    elapsed = time.time() - start_time
-                    if elapsed >= timeout:
-                        break
-                    self.cond.wait(timeout - elapsed)
-                else:
-                    self.cond.wait(1.0)
+            self.cond.wait_for(
+                lambda: (
+                    self.written_bytes >= target_bytes
+                    or self.is_finished
+                    or self.error
+                    or self.aborted
+                ),
+                timeout or None,
+            )
             return self.written_bytes >= target_bytes or self.is_finished
 
 
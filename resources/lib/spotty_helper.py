@@ -16,13 +16,32 @@ from utils import log_msg, log_exception
 KODI_ANDROID_INTERNAL_WRITABLE_DIR = "/data/data/org.xbmc.kodi"
 SPOTTY_SUBDIR = "deps/spotty"
 
+ANDROID_CANDIDATE_PATHS = (
+    ("arm-android", "spotty"),
+    ("arm-android", "spotty-aarch64"),
+    ("x86-android", "spotty"),
+    ("x86-android", "spotty-x86_64"),
+)
+LINUX_CANDIDATE_PATHS = (
+    ("arm-linux", "spotty-muslhf"),
+    ("arm-linux", "spotty"),
+    ("x86-linux", "spotty"),
+)
+
+# Resolved binary path, shared by every SpottyHelper in this process. Resolution
+# may self-test each candidate binary (a subprocess per candidate), so only do it once.
+_resolved_spotty_path: Union[str, None] = None
+
 
 class SpottyHelper:
     def __init__(self):
         self.spotty_binary_path = self.__get_spotty_path()
 
-        self.spotty_rust_env = os.environ.copy()
+        # None lets Popen inherit the parent environment without copying it. Only
+        # Android needs an override, so only build a private env dict there.
+        self.spotty_rust_env = None
         if xbmc.getCondVisibility("System.Platform.Android"):
+            self.spotty_rust_env = os.environ.copy()
             self.spotty_rust_env["TMPDIR"] = KODI_ANDROID_INTERNAL_WRITABLE_DIR
 
     def kill_all_spotties(self) -> None:
@@ -49,6 +68,10 @@ class SpottyHelper:
     @staticmethod
     def __get_spotty_path() -> Union[str, None]:
         """find the correct spotty binary belonging to the platform"""
+        global _resolved_spotty_path
+        if _resolved_spotty_path:
+            return _resolved_spotty_path
+
         spotty_path = None
         if xbmc.getCondVisibility("System.Platform.Windows"):
             spotty_path = os.path.join(
@@ -73,6 +96,7 @@ class SpottyHelper:
         os.chmod(spotty_path, st.st_mode | stat.S_IEXEC)
         log_msg(f"Spotty architecture detected. Using spotty binary '{spotty_path}'.")
 
+        _resolved_spotty_path = spotty_path
         return spotty_path
 
     @staticmethod
@@ -80,13 +104,7 @@ class SpottyHelper:
         spotty_path = None
 
         # Try by testing to get the correct binary path.
-        candidate_paths = [
-            ("arm-android", "spotty"),
-            ("arm-android", "spotty-aarch64"),
-            ("x86-android", "spotty"),
-            ("x86-android", "spotty-x86_64"),
-        ]
-        for path in candidate_paths:
+        for path in ANDROID_CANDIDATE_PATHS:
             binary = os.path.join(os.path.dirname(__file__), SPOTTY_SUBDIR, path[0], path[1])
             test_binary = os.path.join(KODI_ANDROID_INTERNAL_WRITABLE_DIR, "spotty")
             shutil.copyfile(binary, test_binary)
@@ -113,12 +131,7 @@ class SpottyHelper:
         else:
             # When we're unsure about the platform/cpu, try by testing to get
             # the correct binary path.
-            candidate_paths = [
-                ("arm-linux", "spotty-muslhf"),
-                ("arm-linux", "spotty"),
-                ("x86-linux", "spotty"),
-            ]
-            for path in candidate_paths:
+            for path in LINUX_CANDIDATE_PATHS:
                 binary = os.path.join(os.path.dirname(__file__), SPOTTY_SUBDIR, path[0], path[1])
                 if SpottyHelper.__test_spotty(binary):
                     spotty_path = binary
@@ -148,9 +161,11 @@ class SpottyHelper:
 
             stdout, stderr = test_spotty.communicate(timeout=15)
 
-            log_msg(stdout.decode(encoding="UTF-8"))
+            # Match on the raw bytes; decode only for the log line, and never let a
+            # stray non-UTF-8 byte in the self-test output fail the test.
+            log_msg(stdout.decode(encoding="UTF-8", errors="replace"))
 
-            if "ok spotty".encode(encoding="UTF-8") in stdout:
+            if b"ok spotty" in stdout:
                 return True
 
             if xbmc.getCondVisibility("System.Platform.Windows"):
@@ -1,12 +1,13 @@
-import inspect
+import functools
 import os
 import platform
 import signal
 import sys
+import threading
 import time
 import unicodedata
 import traceback
-from typing import Any, Dict, List, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type, Union
 
 import xbmc
 import xbmcaddon
@@ -14,6 +15,9 @@ import xbmcgui
 import xbmcvfs
 from xbmc import LOGDEBUG, LOGINFO, LOGERROR
 
+if TYPE_CHECKING:
+    import spotipy
+
 DEBUG = True
 
 ADDON_ID = "plugin.audio.spotifykodiconnect"
@@ -36,21 +40,34 @@ def log_msg(msg: str, loglevel: int = LOGDEBUG, caller_name: str = "") -> None:
     if DEBUG and (loglevel == LOGDEBUG):
         loglevel = LOGINFO
     if not caller_name:
-        caller_name = get_formatted_caller_name(inspect.stack()[1][1], inspect.stack()[1][3])
+        caller_name = _get_caller_name(sys._getframe(1))
 
     xbmc.log(f"{ADDON_ID}:{caller_name}: {msg}", level=loglevel)
 
 
 def log_exception(exc: Exception, exception_details: str) -> None:
-    the_caller_name = get_formatted_caller_name(inspect.stack()[1][1], inspect.stack()[1][3])
+    the_caller_name = _get_caller_name(sys._getframe(1))
     log_msg(" ".join(traceback.format_exception(type(exc), exc, exc.__traceback__)), loglevel=LOGERROR, caller_name=the_caller_name)
     log_msg(f"Exception --> {exception_details}.", loglevel=LOGERROR, caller_name=the_caller_name)
 
 
+@functools.lru_cache(maxsize=1)
+def get_addon() -> xbmcaddon.Addon:
+    """Process-wide Addon handle for localized strings and addon info lookups."""
+    return xbmcaddon.Addon(id=ADDON_ID)
+
+
 def get_formatted_caller_name(filename: str, function_name: str) -> str:
     return f"{os.path.splitext(os.path.basename(filename))[0]}:{function_name}"
 
 
+def _get_caller_name(frame) -> str:
+    # Read the caller straight off its frame. inspect.stack() builds every frame's
+    # FrameInfo, source context included, which dominated the cost of a log call.
+    code = frame.f_code
+    return get_formatted_caller_name(code.co_filename, code.co_name)
+
+
 def get_time_str(raw_time: int) -> str:
     return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(float(raw_time)))
 
@@ -63,8 +80,7 @@ def get_username() -> str:
     Treat a missing value as empty instead of raising so callers can still
     show generic messages without failing.
     """
-    addon = xbmcaddon.Addon(id=ADDON_ID)
-    return addon.getSetting("username") or ""
+    return get_addon().getSetting("username") or ""
 
 
 def kill_this_plugin() -> None:
@@ -103,18 +119,12 @@ def try_decode(text, encoding="utf-8"):
         return text
 
 
+# Characters that are not safe in file names: path separators become "-", the rest are dropped.
+_FILENAME_TRANSLATION = str.maketrans({"/": "-", "\\": "-", **dict.fromkeys(':<>*?|()"')})
+
+
 def normalize_string(text):
-    text = text.replace(":", "")
-    text = text.replace("/", "-")
-    text = text.replace("\\", "-")
-    text = text.replace("<", "")
-    text = text.replace(">", "")
-    text = text.replace("*", "")
-    text = text.replace("?", "")
-    text = text.replace("|", "")
-    text = text.replace("(", "")
-    text = text.replace(")", "")
-    text = text.replace('"', "")
+    text = text.translate(_FILENAME_TRANSLATION)
     text = text.strip()
     text = text.rstrip(".")
     text = unicodedata.normalize("NFKD", try_decode(text))
@@ -138,6 +148,69 @@ def get_cached_auth_token_expires_at() -> str:
     return get_cached_value_from_kodi(KODI_PROPERTY_AUTH_TOKEN_EXPIRES_AT)
 
 
+_spotify_client: Optional["spotipy.Spotify"] = None
+_spotify_client_lock = threading.Lock()
+
+
+def get_spotify_client(auth_token: str) -> "spotipy.Spotify":
+    """Process-wide spotipy client, re-pointed at the given token.
+
+    Each spotipy.Spotify builds its own requests.Session, so short-lived clients pay a
+    new TCP + TLS handshake per call. Sharing one keeps the connection pool warm.
+    spotipy (and requests under it) is imported on first use to keep service start-up light.
+    """
+    global _spotify_client
+    with _spotify_client_lock:
+        if _spotify_client is None:
+            import spotipy
+
+            _spotify_client = spotipy.Spotify(auth=auth_token)
+        else:
+            _spotify_client.set_auth(auth_token)
+        return _spotify_client
+
+
+# Liked state per track id, shared by the OSD service and the HTTP toggle route so a
+# toggle from either one is seen by both. Entries expire so a like made from another
+# Spotify client shows up on the next lookup after the TTL.
+_LIKED_STATE_TTL_SECS = 300
+_liked_states: Dict[str, Tuple[float, bool]] = {}
+_liked_states_lock = threading.Lock()
+
+
+def get_cached_liked_state(track_id: str) -> Optional[bool]:
+    """Cached liked state of the track, or None when unknown or expired."""
+    with _liked_states_lock:
+        entry = _liked_states.get(track_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > _LIKED_STATE_TTL_SECS:
+            del _liked_states[track_id]
+            return None
+        return entry[1]
+
+
+def cache_liked_states(states: Dict[str, bool]) -> None:
+    now = time.monotonic()
+    with _liked_states_lock:
+        for track_id, liked in states.items():
+            _liked_states[track_id] = (now, bool(liked))
+
+
+def clear_liked_states() -> None:
+    with _liked_states_lock:
+        _liked_states.clear()
+
+
+def spotify_api_errors() -> Tuple[Type[Exception], ...]:
+    """Exceptions a failed Web API call raises, for except clauses that must not import
+    spotipy up front."""
+    import requests
+    from spotipy import SpotifyException
+
+    return SpotifyException, requests.RequestException
+
+
 def cache_value_in_kodi(kodi_property_id: str, value: Any):
     win = xbmcgui.Window(ADDON_WINDOW_ID)
     win.setProperty(kodi_property_id, value)